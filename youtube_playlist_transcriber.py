@@ -1,7 +1,9 @@
 import os
 import json
-import whisper
 import subprocess
+import numpy as np
+import ctranslate2
+from faster_whisper import BatchedInferencePipeline, WhisperModel
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
@@ -17,6 +19,10 @@ from pytubefix.exceptions import (
 )
 import sys
 import time
+import random
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from urllib.error import HTTPError
 from dotenv import load_dotenv
 
@@ -26,6 +32,40 @@ load_dotenv()
 # Replace hardcoded paths with environment variables
 VIDEO_OUTPUT_PATH = os.getenv('VIDEO_OUTPUT_PATH')
 TRANSCRIPTION_OUTPUT_PATH = os.getenv('TRANSCRIPTION_OUTPUT_PATH')
+# Keep the merged video file; when disabled only the audio track is downloaded
+SAVE_VIDEO = os.getenv('SAVE_VIDEO', 'true').lower() in ('1', 'true', 'yes')
+
+# Whisper model runs with CTranslate2 int8 weights (int8_float16 on GPU)
+CUDA_DEVICE_COUNT = ctranslate2.get_cuda_device_count()
+WHISPER_DEVICE = "cuda" if CUDA_DEVICE_COUNT > 0 else "cpu"
+# Small English-only model by default; override with WHISPER_MODEL (e.g. "base"
+# or "turbo" for other languages, "distil-large-v3" for accuracy on a large GPU)
+WHISPER_MODEL = os.getenv('WHISPER_MODEL') or "base.en"
+# Fused Flash-Attention kernels in CTranslate2 (GPU only, needs compute capability 8.0+
+# and a CTranslate2 built from source with WITH_FLASH_ATTN; PyPI wheels lack it)
+WHISPER_FLASH_ATTENTION = (
+    WHISPER_DEVICE == "cuda"
+    and os.getenv('WHISPER_FLASH_ATTENTION', 'false').lower() in ('1', 'true', 'yes')
+)
+WHISPER_BATCH_SIZE = 16
+# Model replicas per GPU: two on a single GPU so one video's encoder can overlap
+# another's decoder, one per GPU when several are available
+WHISPER_WORKERS_PER_DEVICE = 2 if CUDA_DEVICE_COUNT == 1 else 1
+WHISPER_DEVICE_INDEX = list(range(CUDA_DEVICE_COUNT)) or [0]
+_whisper_model = None
+_whisper_model_lock = threading.Lock()
+_batched_pipeline = threading.local()
+
+# Downloads run in a small thread pool while one transcription thread per model
+# replica transcribes. Decoded audio is ~230 MB per hour of video, and up to
+# AUDIO_QUEUE_SIZE queued plus DOWNLOAD_WORKERS blocked and TRANSCRIBE_WORKERS
+# in-progress tracks can be held in memory at once
+DOWNLOAD_WORKERS = 3
+TRANSCRIBE_WORKERS = (
+    WHISPER_WORKERS_PER_DEVICE * CUDA_DEVICE_COUNT if WHISPER_DEVICE == "cuda" else 1
+)
+# One ready track per transcription thread is enough to keep it busy
+AUDIO_QUEUE_SIZE = TRANSCRIBE_WORKERS
 
 # Set up OAuth2 credentials
 CLIENT_SECRETS_FILE = "client_secrets.json"  # Path to the downloaded JSON file
@@ -56,51 +96,101 @@ def get_authenticated_service():
 
 # Load transcribed videos record with playlist information
 transcribed_videos_file = 'transcribed_videos.json'
+# Append-only log of videos recorded since the JSON file was last written
+transcribed_log_file = 'transcribed.log'
+_transcribed_lock = threading.Lock()
+
 def load_transcribed_videos():
+    data = {}
     if os.path.exists(transcribed_videos_file):
         with open(transcribed_videos_file, 'r') as file:
             data = json.load(file)
             # Convert old format to new if necessary
             if isinstance(data, list):
-                return {'default': data}
-            return data
-    return {}
-
-def video_exists_in_any_playlist(video_id, transcribed_data):
-    """Check if video exists in any playlist."""
-    for playlist_data in transcribed_data.values():
-        if video_id in playlist_data.get('videos', []):
-            return True
-    return False
-
-def save_transcribed_video(video_id, playlist_id, playlist_title):
-    transcribed_data = load_transcribed_videos()
+                data = {'default': {'title': 'default', 'videos': data}}
+    
+    # Hold each playlist's videos as an insertion-ordered dict for O(1) lookups;
+    # write_transcribed_videos turns them back into lists
+    for playlist_data in data.values():
+        playlist_data['videos'] = dict.fromkeys(playlist_data.get('videos', []))
     
+    # Replay videos recorded by a run that exited before writing the JSON file
+    if os.path.exists(transcribed_log_file):
+        with open(transcribed_log_file, 'r') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Partially written line from a crash
+                add_transcribed_video(data, entry['video_id'], entry['playlist_id'], entry['playlist_title'])
+    return data
+
+def transcribed_video_ids(transcribed_data):
+    """Collect the IDs of videos transcribed in any playlist into a set."""
+    return {
+        video_id
+        for playlist_data in transcribed_data.values()
+        for video_id in playlist_data.get('videos', [])
+    }
+
+def add_transcribed_video(transcribed_data, video_id, playlist_id, playlist_title):
+    """Record a video in the in-memory data; returns False if already recorded."""
     # Create playlist entry if it doesn't exist
     if playlist_id not in transcribed_data:
         transcribed_data[playlist_id] = {
             'title': playlist_title,
-            'videos': []
+            'videos': {}
         }
     
     # Add video if not already in this playlist
-    if video_id not in transcribed_data[playlist_id]['videos']:
-        transcribed_data[playlist_id]['videos'].append(video_id)
-        
-    # Save updated data
-    with open(transcribed_videos_file, 'w') as file:
-        json.dump(transcribed_data, file, indent=2)
+    if video_id in transcribed_data[playlist_id]['videos']:
+        return False
+    transcribed_data[playlist_id]['videos'][video_id] = None
+    return True
+
+def save_transcribed_video(video_id, playlist_id, playlist_title, data):
+    # Download and transcription threads may record videos concurrently
+    with _transcribed_lock:
+        if add_transcribed_video(data, video_id, playlist_id, playlist_title):
+            # Append to the log so progress survives a crash before the final write
+            with open(transcribed_log_file, 'a') as file:
+                file.write(json.dumps({
+                    'video_id': video_id,
+                    'playlist_id': playlist_id,
+                    'playlist_title': playlist_title
+                }) + '\n')
+
+def write_transcribed_videos(data):
+    """Write the consolidated record and discard the log it supersedes."""
+    with _transcribed_lock:
+        # Write to a temp file and rename so a crash never leaves a truncated record
+        temp_file = transcribed_videos_file + '.tmp'
+        with open(temp_file, 'w') as file:
+            json.dump(
+                {
+                    playlist_id: dict(playlist_data, videos=list(playlist_data['videos']))
+                    for playlist_id, playlist_data in data.items()
+                },
+                file,
+                separators=(',', ':')
+            )
+        os.replace(temp_file, transcribed_videos_file)
+        if os.path.exists(transcribed_log_file):
+            os.remove(transcribed_log_file)
 
 def fetch_playlist_videos(youtube, playlist_id):
     videos = []
     next_page_token = None
     
+    # Page tokens chain, so pages are fetched in order; request only the
+    # fields we use to keep each response small
     while True:
         request = youtube.playlistItems().list(
             part='snippet',
             playlistId=playlist_id,
             maxResults=50,
-            pageToken=next_page_token
+            pageToken=next_page_token,
+            fields='items(snippet(title,resourceId/videoId)),nextPageToken'
         )
         response = request.execute()
         videos.extend(response['items'])
@@ -116,25 +206,79 @@ def fetch_playlist_videos(youtube, playlist_id):
     print(f"\nTotal videos found in playlist: {len(videos)}")
     return videos
 
+# ASCII characters not allowed in filenames, mapped to None for str.translate
+_FILENAME_STRIP_TABLE = {
+    code: None
+    for code in range(128)
+    if not (chr(code).isalnum() or chr(code) in ' -_')
+}
+
 def clean_filename(text):
     """Clean text for use in filenames"""
-    return "".join(c for c in text if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    cleaned = text.translate(_FILENAME_STRIP_TABLE)
+    if not cleaned.isascii():
+        # Keep non-ASCII letters and digits, drop other non-ASCII characters
+        cleaned = "".join(c for c in cleaned if c.isascii() or c.isalnum())
+    return cleaned.rstrip()
+
+# Guards pytubefix's interactive OAuth device flow across download workers
+_youtube_oauth_lock = threading.Lock()
+_youtube_oauth_ready = False
+
+def open_youtube(url):
+    """Create a pytubefix YouTube object, running the OAuth flow at most once."""
+    global _youtube_oauth_ready
+    if _youtube_oauth_ready:
+        return YouTube(url, use_oauth=True, allow_oauth_cache=True)
+    
+    # The first worker fetches streams under the lock, which prompts for the
+    # device code and caches the token; the others wait and reuse it
+    with _youtube_oauth_lock:
+        yt = YouTube(url, use_oauth=True, allow_oauth_cache=True)
+        if not _youtube_oauth_ready:
+            yt.streams
+            _youtube_oauth_ready = True
+        return yt
+
+def media_filename(video_id, video_title, playlist_title):
+    """Base filename shared by a video's download and its transcript."""
+    # Clean the video and playlist titles for use in filename
+    clean_video_title = clean_filename(video_title)
+    clean_playlist = clean_filename(playlist_title)
+    return f'{clean_playlist} - {video_id} - {clean_video_title}'
 
-def download_video_and_audio(video_id, video_title, playlist_title, output_path):
+def retry_delay(retry_count, error, max_delay=30):
+    """Seconds to wait before a retry: Retry-After if given, else exponential backoff with jitter."""
+    if isinstance(error, HTTPError) and error.headers:
+        retry_after = error.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            return min(max_delay, int(retry_after))
+    return min(max_delay, 2 ** retry_count + random.random())
+
+def download_video_and_audio(video_id, video_title, playlist_id, playlist_title, output_path,
+                             transcribed_data, save_video=True):
     url = f'https://www.youtube.com/watch?v={video_id}'
     max_retries = 3
     retry_count = 0
     
     while retry_count < max_retries:
         try:
-            time.sleep(1)
             # Remove use_po_token, only use OAuth
-            yt = YouTube(url, use_oauth=True, allow_oauth_cache=True)
+            yt = open_youtube(url)
+            
+            filename = media_filename(video_id, video_title, playlist_title)
             
-            # Clean the video and playlist titles for use in filename
-            clean_video_title = clean_filename(video_title)
-            clean_playlist = clean_filename(playlist_title)
-            filename = f'{clean_playlist} - {video_id} - {clean_video_title}'
+            # Transcription only needs the audio track, so skip the video and merge
+            if not save_video:
+                audio_stream = (yt.streams
+                              .filter(only_audio=True, file_extension='mp4')
+                              .first())
+                if audio_stream:
+                    audio_file_path = os.path.join(output_path, f'{filename}.m4a')
+                    audio_stream.download(output_path=output_path, filename=f'{filename}.m4a')
+                    print(f"Audio downloaded to: {audio_file_path}")
+                    return audio_file_path
+                print("No suitable audio stream found, falling back to video download")
             
             # First try adaptive stream for highest quality video
             stream = (yt.streams
@@ -150,27 +294,46 @@ def download_video_and_audio(video_id, video_title, playlist_title, output_path)
             
             if stream and audio_stream:
                 print(f"Selected video resolution: {stream.resolution}")
-                # Download video
                 temp_video_path = os.path.join(output_path, f'temp_video_{filename}.mp4')
-                stream.download(output_path=output_path, filename=f'temp_video_{filename}.mp4')
-                
-                # Download audio
                 temp_audio_path = os.path.join(output_path, f'temp_audio_{filename}.mp4')
-                audio_stream.download(output_path=output_path, filename=f'temp_audio_{filename}.mp4')
+                
+                # Download video and audio concurrently; result() re-raises download errors
+                with ThreadPoolExecutor(max_workers=2) as stream_executor:
+                    video_future = stream_executor.submit(
+                        stream.download, output_path=output_path, filename=f'temp_video_{filename}.mp4')
+                    audio_future = stream_executor.submit(
+                        audio_stream.download, output_path=output_path, filename=f'temp_audio_{filename}.mp4')
+                    video_future.result()
+                    audio_future.result()
                 
                 # Merge video and audio using ffmpeg
                 final_file_path = os.path.join(output_path, f'{filename}.mp4')
+                # YouTube's mp4 audio stream is already AAC, so both streams are copied.
+                # Inputs stay seekable (no -seekable 0): an mp4 with its moov atom at
+                # the end cannot be demuxed without seeking
                 merge_command = [
                     'ffmpeg',
+                    '-loglevel', 'error',
+                    '-thread_queue_size', '1024',
                     '-i', temp_video_path,
+                    '-thread_queue_size', '1024',
                     '-i', temp_audio_path,
-                    '-c:v', 'copy',
-                    '-c:a', 'aac',
+                    '-c', 'copy',
                     '-y',
                     final_file_path
                 ]
                 
-                subprocess.run(merge_command, check=True, capture_output=True)
+                # Nothing useful on stdout; stderr is only read if the merge fails
+                try:
+                    subprocess.run(
+                        merge_command,
+                        check=True,
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.PIPE
+                    )
+                except subprocess.CalledProcessError as e:
+                    print(f"Error merging video and audio: {e.stderr.decode(errors='replace')}")
+                    raise
                 
                 # Clean up temporary files
                 if os.path.exists(temp_video_path):
@@ -196,70 +359,105 @@ def download_video_and_audio(video_id, video_title, playlist_title, output_path)
                     print(f"Video downloaded to: {final_file_path}")
                     return final_file_path
                 
+                # Retrying would only find the same streams again
+                print(f"No downloadable streams found for video {video_id}")
+                return None
+                
         except (MembersOnly, VideoPrivate, VideoRegionBlocked, AgeRestrictedError, 
                 LiveStreamError, HTTPError, VideoUnavailable) as e:  # Add VideoUnavailable
             print(f"Error downloading video {video_id}: {str(e)}")
             if isinstance(e, (MembersOnly, VideoUnavailable)):  # Special handling for members-only videos
                 print(f"Skipping members-only or unavailable video: {video_title}")
                 # Add to transcribed videos to avoid retrying
-                save_transcribed_video(video_id, PLAYLIST_ID, "Unknown Playlist")
+                save_transcribed_video(video_id, playlist_id, playlist_title, transcribed_data)
                 return None
             
             retry_count += 1
             if retry_count < max_retries:
                 print(f"Retrying... (Attempt {retry_count + 1} of {max_retries})")
-                time.sleep(2)
+                time.sleep(retry_delay(retry_count, e))
                 continue
             
     print(f"Failed to download video '{video_id}' after {max_retries} attempts. Skipping...")
     return None
 
-def extract_audio(video_path, audio_path):
-    # Normalize paths
+def extract_audio(video_path):
+    """Decode a video's audio track to 16 kHz mono float32 samples in memory."""
+    # Normalize path
     video_path = os.path.normpath(video_path)
-    audio_path = os.path.normpath(audio_path)
     
     command = [
         "ffmpeg",
+        "-loglevel", "error",  # Only errors on stderr
         "-i", video_path,
         "-vn",  # No video
         "-acodec", "pcm_s16le",  # Audio codec
         "-ar", "16000",  # Sample rate
         "-ac", "1",  # Mono
-        "-f", "wav",  # Force WAV format
-        "-y",  # Overwrite output file
-        audio_path
+        "-f", "s16le",  # Raw PCM, no container
+        "-"  # Write to stdout instead of a file
     ]
     
     try:
-        # Create output directory if it doesn't exist
-        os.makedirs(os.path.dirname(audio_path), exist_ok=True)
-        
-        # Run ffmpeg command
+        # Run ffmpeg command; stdout carries the audio, stderr only errors
         result = subprocess.run(
             command,
             check=True,
-            capture_output=True,
-            text=True
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
         )
-        
-        if os.path.exists(audio_path):
-            print(f"Audio extracted successfully to: {audio_path}")
-            return True
-        else:
-            print(f"Audio file not created at: {audio_path}")
-            return False
-            
     except subprocess.CalledProcessError as e:
-        print(f"Error extracting audio: {e.stderr}")
+        print(f"Error extracting audio: {e.stderr.decode(errors='replace')}")
         # Print the command that failed
         print(f"Failed command: {' '.join(command)}")
-        return False
+        return None
+    
+    if not result.stdout:
+        print(f"No audio decoded from: {video_path}")
+        return None
+    
+    print(f"Audio extracted successfully from: {video_path}")
+    # Scale in place so only one float32 copy of the track is allocated
+    audio = np.frombuffer(result.stdout, np.int16).astype(np.float32)
+    audio /= 32768.0
+    return audio
+
+def get_whisper_model():
+    """Load the Whisper model on first use and reuse it for every video."""
+    global _whisper_model
+    # Several transcription threads may ask for the model at the same time
+    with _whisper_model_lock:
+        if _whisper_model is None:
+            # CTranslate2 places a replica on every listed GPU; concurrent
+            # transcribe calls from different threads run on separate replicas
+            _whisper_model = WhisperModel(
+                WHISPER_MODEL,
+                device=WHISPER_DEVICE,
+                device_index=WHISPER_DEVICE_INDEX,
+                compute_type="int8_float16" if WHISPER_DEVICE == "cuda" else "int8",
+                num_workers=WHISPER_WORKERS_PER_DEVICE,
+                # Only pass the option when enabled: CTranslate2 < 4.3 rejects it
+                **({'flash_attention': True} if WHISPER_FLASH_ATTENTION else {})
+            )
+    return _whisper_model
 
-def transcribe_audio(audio_path):
-    model = whisper.load_model("base")
-    result = model.transcribe(audio_path)
-    return result["text"]
+def get_batched_pipeline():
+    """Wrap the cached model in a pipeline that decodes audio chunks in batches."""
+    # One pipeline per transcription thread; they all share the same model
+    if not hasattr(_batched_pipeline, 'pipeline'):
+        _batched_pipeline.pipeline = BatchedInferencePipeline(model=get_whisper_model())
+    return _batched_pipeline.pipeline
+
+def transcribe_audio(audio):
+    segments, _ = get_batched_pipeline().transcribe(
+        audio,
+        beam_size=5,
+        # Silero VAD drops silent spans before decoding; the batched pipeline's
+        # default already splits on pauses of 160 ms or more
+        vad_filter=True,
+        batch_size=WHISPER_BATCH_SIZE
+    )
+    return "".join(segment.text for segment in segments)
 
 def fetch_user_playlists(youtube):
     """Fetch all playlists owned by the authenticated user."""
@@ -285,7 +483,8 @@ def fetch_user_playlists(youtube):
                 part="snippet",
                 channelId=channel_id,
                 maxResults=50,
-                pageToken=next_page_token
+                pageToken=next_page_token,
+                fields='items(id,snippet/title),nextPageToken'
             )
             response = request.execute()
             
@@ -328,33 +527,97 @@ def get_current_channel(youtube):
     response = request.execute()
     return response['items'][0]['snippet']['title']
 
-def is_video_transcribed(video_id, playlist_title, output_path):
-    # Check specifically in this playlist's directory
-    playlist_path = os.path.join(output_path, sanitize_filename(playlist_title))
-    transcript_file = os.path.join(playlist_path, f"{video_id}.txt")
+def find_transcribed_video_ids(videos, playlist_title, output_path):
+    """Return IDs of the given (video_id, video_title) pairs with a non-empty transcript."""
+    # Match exact transcript names so another playlist whose title merely
+    # starts with this one's is never picked up
+    expected = {
+        f'{media_filename(video_id, video_title, playlist_title)}.txt': video_id
+        for video_id, video_title in videos
+    }
+    video_ids = set()
+    
+    # One directory listing instead of a stat and read per video
+    try:
+        with os.scandir(output_path) as entries:
+            for entry in entries:
+                if (entry.name in expected and entry.is_file()
+                        and entry.stat().st_size > 0):
+                    video_ids.add(expected[entry.name])
+    except FileNotFoundError:
+        pass
+    return video_ids
+
+def prepare_audio(video_id, video_title, playlist_id, playlist_title, transcribed_data,
+                  audio_queue, stop_event):
+    """Download a video, extract its audio and queue it for transcription."""
+    if stop_event.is_set():
+        return
     
-    # Only return True if the file exists AND has content
-    if os.path.exists(transcript_file):
-        try:
-            with open(transcript_file, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                return bool(content)  # Returns False if file is empty
-        except Exception:
-            return False
-    return False
-
-def process_video(video_id, video_title, playlist_title, output_path):
     print(f"\nProcessing new video: '{video_title}' (ID: {video_id})")
+    print(f"Downloading video '{video_title}'...")
+    # Log and skip any failure so one video cannot abort the whole run
+    try:
+        video_path = download_video_and_audio(video_id, video_title, playlist_id, playlist_title,
+                                              VIDEO_OUTPUT_PATH, transcribed_data, save_video=SAVE_VIDEO)
+    except Exception as e:
+        print(f"Error downloading video '{video_title}': {str(e)}. Skipping...")
+        return
+    
+    if not video_path:
+        print(f"Failed to download video '{video_title}'. Skipping...")
+        return
     
-    # Check if this specific video is already transcribed in this specific playlist
-    if is_video_transcribed(video_id, playlist_title, output_path):
-        print(f"Video '{video_title}' already transcribed in playlist '{playlist_title}'")
-        return True
+    # Use the same filename pattern for the transcription
+    base_filename = os.path.splitext(os.path.basename(video_path))[0]
     
-    # If we find it in another playlist, we should still process it for this playlist
-    # Remove or modify this cross-playlist check if you want to process each video fresh for each playlist
+    print(f"Extracting audio from video '{video_title}'...")
+    try:
+        audio = extract_audio(video_path)
+    except Exception as e:
+        print(f"Error extracting audio from video '{video_title}': {str(e)}")
+        audio = None
+    
+    # The downloaded file was only needed for its audio
+    if not SAVE_VIDEO and os.path.exists(video_path):
+        os.remove(video_path)
     
-    # Rest of the function remains the same...
+    if audio is None:
+        print(f"Failed to extract audio from video '{video_title}'. Skipping...")
+        return
+    
+    # Blocks while the transcription threads are behind, but gives up once the
+    # run is stopping so no producer waits on a queue nobody will drain
+    while not stop_event.is_set():
+        try:
+            audio_queue.put((video_id, video_title, audio, base_filename), timeout=1)
+            return
+        except queue.Full:
+            continue
+
+def transcription_worker(audio_queue, playlist_id, playlist_title, transcribed_data, stop_event):
+    """Transcribe queued audio files until a None sentinel is received."""
+    while True:
+        item = audio_queue.get()
+        if item is None:
+            break
+        if stop_event.is_set():
+            continue  # Run is stopping; drain the queue without transcribing
+        video_id, video_title, audio, base_filename = item
+        
+        try:
+            print(f"Transcribing audio for '{video_title}'...")
+            transcription = transcribe_audio(audio)
+            
+            # Save transcription with playlist info in filename
+            transcription_file_path = os.path.join(TRANSCRIPTION_OUTPUT_PATH, f'{base_filename}.txt')
+            with open(transcription_file_path, 'w', encoding='utf-8') as file:
+                file.write(transcription)
+            
+            # Update transcribed videos record with playlist info
+            save_transcribed_video(video_id, playlist_id, playlist_title, transcribed_data)
+        except Exception as e:
+            print(f"Error transcribing video '{video_title}': {str(e)}")
 
 def main():
     print("Authenticating and initializing YouTube API client...")
@@ -393,62 +656,94 @@ def main():
     
     # Load transcribed videos with playlist information
     transcribed_data = load_transcribed_videos()
-    playlist_videos = transcribed_data.get(playlist_id, {}).get('videos', [])
+    playlist_videos = list(transcribed_data.get(playlist_id, {}).get('videos', []))
+    # Sets built once so each membership check below is O(1)
+    all_video_ids = transcribed_video_ids(transcribed_data)
+    playlist_video_ids = set(playlist_videos)
+    existing_transcripts = find_transcribed_video_ids(
+        [(video['snippet']['resourceId']['videoId'], video['snippet']['title']) for video in videos],
+        playlist_title,
+        TRANSCRIPTION_OUTPUT_PATH
+    )
     
     print(f"\nCurrently transcribed videos in this playlist: {len(playlist_videos)}")
     print("First few transcribed video IDs:", playlist_videos[:5] if playlist_videos else "None")
     
+    # Decide which videos still need processing
+    new_videos = []
     for video in videos:
         video_id = video['snippet']['resourceId']['videoId']
         video_title = video['snippet']['title']
         
-        # Check if video exists in any playlist
-        if video_exists_in_any_playlist(video_id, transcribed_data):
-            print(f"Video '{video_title}' already transcribed in another playlist. Adding to current playlist...")
-            save_transcribed_video(video_id, playlist_id, playlist_title)
-            continue
-        
-        if video_id in playlist_videos:
+        if video_id in playlist_video_ids:
             print(f"Video '{video_title}' already in current playlist. Skipping...")
             continue
         
-        print(f"\nProcessing new video: '{video_title}' (ID: {video_id})")
-        print(f"Downloading video '{video_title}'...")
-        video_path = download_video_and_audio(video_id, video_title, playlist_title, VIDEO_OUTPUT_PATH)
+        # Every later entry for this video is skipped above; a playlist can list
+        # the same video twice and two workers must never download it at once
+        playlist_video_ids.add(video_id)
         
-        if not video_path:
-            print(f"Failed to download video '{video_title}'. Skipping...")
+        # Check if video exists in any playlist
+        if video_id in all_video_ids:
+            print(f"Video '{video_title}' already transcribed in another playlist. Adding to current playlist...")
+            save_transcribed_video(video_id, playlist_id, playlist_title, transcribed_data)
             continue
         
-        # Use the same filename pattern for the audio and transcription
-        base_filename = os.path.splitext(os.path.basename(video_path))[0]
-        audio_path = os.path.join(VIDEO_OUTPUT_PATH, f'{base_filename}.wav')
-        
-        print("Extracting audio from video...")
-        if not extract_audio(video_path, audio_path):
-            print(f"Failed to extract audio from video '{video_title}'. Skipping...")
+        if video_id in existing_transcripts:
+            print(f"Transcript for '{video_title}' already exists. Recording and skipping...")
+            save_transcribed_video(video_id, playlist_id, playlist_title, transcribed_data)
+            all_video_ids.add(video_id)
             continue
-            
-        if not os.path.exists(audio_path):
-            print(f"Audio file not found at: {audio_path}. Skipping...")
-            continue
-            
-        print("Transcribing audio...")
-        transcription = transcribe_audio(audio_path)
         
-        # Save transcription with playlist info in filename
-        transcription_file_path = os.path.join(TRANSCRIPTION_OUTPUT_PATH, f'{base_filename}.txt')
-        with open(transcription_file_path, 'w', encoding='utf-8') as file:
-            file.write(transcription)
-        
-        # Update transcribed videos record with playlist info
-        save_transcribed_video(video_id, playlist_id, playlist_title)
-        
-        # Clean up
-        os.remove(audio_path)
-        
-        # After successful transcription, add to newly processed list
-        save_transcribed_video(video_id, playlist_id, playlist_title)
+        new_videos.append((video_id, video_title))
+    
+    # Load the model up front so a bad WHISPER_MODEL, missing Flash-Attention
+    # support or an out-of-memory GPU stops the run before anything downloads
+    if new_videos:
+        print(f"\nLoading Whisper model '{WHISPER_MODEL}' on {WHISPER_DEVICE}...")
+        get_whisper_model()
+    
+    # Download in parallel while the transcription threads consume ready audio
+    audio_queue = queue.Queue(maxsize=AUDIO_QUEUE_SIZE)
+    stop_event = threading.Event()
+    transcribers = [
+        threading.Thread(
+            target=transcription_worker,
+            args=(audio_queue, playlist_id, playlist_title, transcribed_data, stop_event)
+        )
+        for _ in range(TRANSCRIBE_WORKERS)
+    ]
+    for transcriber in transcribers:
+        transcriber.start()
+    
+    executor = ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS)
+    futures = []
+    try:
+        for video_id, video_title in new_videos:
+            futures.append(executor.submit(
+                prepare_audio, video_id, video_title, playlist_id, playlist_title,
+                transcribed_data, audio_queue, stop_event
+            ))
+        for future in futures:
+            future.result()
+    except BaseException:
+        # Ctrl-C or an unexpected error: drop downloads that have not started and
+        # tell running downloads and the transcription threads to stop
+        stop_event.set()
+        for future in futures:
+            future.cancel()
+        raise
+    finally:
+        # Only wait for the pool on a normal finish; after a stop, in-flight
+        # downloads end on their own without queueing anything
+        executor.shutdown(wait=not stop_event.is_set())
+        # One sentinel per transcription thread
+        for _ in transcribers:
+            audio_queue.put(None)
+        for transcriber in transcribers:
+            transcriber.join()
+        # Persist the whole record once instead of after every video
+        write_transcribed_videos(transcribed_data)
 
 if __name__ == "__main__":
     os.makedirs(VIDEO_OUTPUT_PATH, exist_ok=True)